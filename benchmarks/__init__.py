@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the package is written against nijirate/ being a source root (see .idea), mirror that here
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nijirate"))
@@ -0,0 +1,279 @@
+"""
+Benchmarks for the parser, hit-testing, geometry, rendering and sync hot paths.
+
+    python -m benchmarks.bench                       # writes benchmarks/results/<commit>.json
+    python -m benchmarks.bench --compare old.json    # also reports regressions against old.json
+
+Each benchmark is run over increasing sizes. A size whose run is projected (from how the smaller sizes
+scaled) to take over --budget seconds is skipped along with everything larger, and recorded as skipped.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List, Optional
+
+from benchmarks.generators import make_points, make_scenegraph, make_score_export
+from editor.previewer.control import MouseSelector, SelectMode
+from editor.previewer.gizmos import BoundingBox
+from editor.state import State
+from score import ScoreParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SCORE_ROWS = [10 ** e for e in range(2, 7)]
+SCENE_SIZES = [10 ** e for e in range(1, 6)]
+HIT_TEST_QUERIES = 200
+RENDER_FRAMES = 10
+
+
+def _time(fn: Callable[[], None], repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def _project(history, n) -> float:
+    """
+    seconds a run at size n should take, extrapolating the growth between the last two sizes
+    that ran. growth is assumed to be at least linear so noise at small sizes can't hide a jump
+    """
+    (n0, t0), (n1, t1) = history[-2:] if len(history) > 1 else history * 2
+    exponent = 1.0
+    if n1 > n0 and t0 > 0 and t1 > 0:
+        exponent = max(1.0, math.log(t1 / t0) / math.log(n1 / n0))
+    return t1 * (n / n1) ** exponent
+
+
+class Suite:
+    def __init__(self, repeat: int, budget: float):
+        self.repeat = repeat
+        self.budget = budget
+        self.results = []
+
+    def _record(self, bench, n, runs, per, unit, extra=None):
+        best = min(runs)
+        result = {
+            "bench": bench,
+            "n": n,
+            "seconds": {"min": best, "median": statistics.median(runs)},
+            "throughput": per / best if best > 0 else None,
+            "unit": unit,
+        }
+        if extra is not None:
+            result.update(extra)
+        self.results.append(result)
+        print(f"{bench:>24} n={n:<8} min {best * 1000:10.3f} ms  {result['throughput'] or 0:14.1f} {unit}")
+        return result
+
+    def _skip(self, bench, n, reason, projected=None):
+        result = {"bench": bench, "n": n, "skipped": reason}
+        if projected is not None:
+            result["projected_seconds"] = projected
+            reason = f"{reason}, projected {projected:.1f} s per run"
+        self.results.append(result)
+        print(f"{bench:>24} n={n:<8} skipped ({reason})")
+
+    def scaled(self, bench: str, sizes: List[int], setup, run, per: Callable[[int], int], unit: str):
+        """
+        runs bench at each size in turn. before each size its cost is projected from how the
+        previous sizes scaled, and it and every larger size are skipped if that is over budget
+        """
+        over = False
+        history = []  # (n, best seconds) of every size that ran
+        for n in sizes:
+            if over:
+                self._skip(bench, n, "budget")
+                continue
+            if history:
+                projected = _project(history, n)
+                if projected > self.budget:
+                    self._skip(bench, n, "budget", projected)
+                    over = True
+                    continue
+            ctx = setup(n)
+            runs = _time(lambda: run(ctx), self.repeat)
+            self._record(bench, n, runs, per(n), unit)
+            history.append((n, min(runs)))
+            over = min(runs) > self.budget
+
+    # benchmarks
+
+    def parse(self):
+        self.scaled("ScoreParser.parse", SCORE_ROWS,
+                    setup=make_score_export,
+                    run=lambda text: ScoreParser(text).parse(),
+                    per=lambda n: n, unit="rows/s")
+
+    def hit_test(self):
+        points = make_points(HIT_TEST_QUERIES)
+
+        def setup(n):
+            state = State()
+            state.set_scenegraph(make_scenegraph(n))
+            return state
+
+        def singleton(state):
+            selector = MouseSelector(state)
+            for p in points:
+                selector._do_singleton_selection(p)
+
+        def box(state):
+            mode = SelectMode(state)
+            for i in range(0, len(points) - 1, 2):
+                mode.mouseup(points[i], points[i + 1])
+
+        self.scaled("singleton_selection", SCENE_SIZES, setup, singleton,
+                    per=lambda _: len(points), unit="queries/s")
+        self.scaled("SelectMode.mouseup", SCENE_SIZES, setup, box,
+                    per=lambda _: len(points) // 2, unit="queries/s")
+
+    def geometry(self):
+        def boundingbox(bb):
+            bb.get_rect()
+
+        def scaleboxes(bb):
+            for sbox in bb.get_size_boxes():
+                sbox.get_rect()
+
+        self.scaled("BoundingBox.get_rect", SCENE_SIZES, lambda n: BoundingBox(make_scenegraph(n)), boundingbox,
+                    per=lambda _: 1, unit="calls/s")
+        self.scaled("ScaleBox.get_rect", SCENE_SIZES, lambda n: BoundingBox(make_scenegraph(n)), scaleboxes,
+                    per=lambda _: 4, unit="calls/s")
+
+    def render(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        try:
+            import pygame
+            from editor.previewer.base import WIDTH, HEIGHT
+            from editor.previewer.renderer import ComponentRenderer
+        except ImportError:
+            for n in SCENE_SIZES:
+                self._skip("render_frame", n, "pygame unavailable")
+            return
+        pygame.init()
+        pygame.font.init()
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        renderer = ComponentRenderer(surface)
+
+        def frames(scenegraph):
+            for _ in range(RENDER_FRAMES):
+                surface.fill((0, 0, 0))
+                for c in scenegraph:
+                    c.accept(renderer)
+
+        self.scaled("render_frame", SCENE_SIZES, make_scenegraph, frames,
+                    per=lambda _: RENDER_FRAMES, unit="frames/s")
+        pygame.quit()
+
+    def sync(self):
+        # This is the pickled State, the model ModelManager keeps in sync between processes.
+        # It is not the exact message: update_state currently sends the whole manager
+        # (self), and a manager can't be built here since its listener thread never exits
+        for n in SCENE_SIZES:
+            state = State()
+            state.set_scenegraph(make_scenegraph(n))
+            state.set_selected(state.get_scenegraph()[:max(1, n // 10)])
+            payload = pickle.dumps(state)
+            runs = _time(lambda: pickle.dumps(state), self.repeat)
+            self._record("State.sync_payload", n, runs, len(payload), "bytes/s", {"payload_bytes": len(payload)})
+
+
+BENCHMARKS = ["parse", "hit_test", "geometry", "render", "sync"]
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def compare(old: dict, new: dict, threshold: float) -> List[str]:
+    """
+    lists benchmarks whose best time got more than threshold (fractional) slower, and any size
+    that was measured before but skipped now, since that usually means it blew the budget.
+    the latter only counts when both runs had the same budget
+    """
+    def index(report):
+        return {(r["bench"], r["n"]): r for r in report["results"]}
+
+    samebudget = old["meta"].get("budget") == new["meta"].get("budget")
+    before, after = index(old), index(new)
+    regressions = []
+    for key in sorted(before.keys() & after.keys()):
+        if "skipped" in before[key]:
+            continue
+        if "skipped" in after[key]:
+            if not samebudget and after[key]["skipped"] == "budget":
+                continue
+            regressions.append(f"{key[0]} n={key[1]}: {before[key]['seconds']['min'] * 1000:.3f} ms -> "
+                               f"skipped ({after[key]['skipped']})")
+            continue
+        a, b = before[key]["seconds"]["min"], after[key]["seconds"]["min"]
+        if a > 0 and (b - a) / a > threshold:
+            regressions.append(f"{key[0]} n={key[1]}: {a * 1000:.3f} ms -> {b * 1000:.3f} ms ({b / a:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds a single run may take before "
+                                                                  "larger sizes are skipped")
+    parser.add_argument("--out", help="defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="previous results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    suite = Suite(max(1, args.repeat), args.budget)
+    for name in args.only:
+        getattr(suite, name)()
+
+    commit = _commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": suite.repeat,
+            "budget": suite.budget,
+        },
+        "results": suite.results,
+    }
+    report["meta"]["skipped"] = sum(1 for r in suite.results if "skipped" in r)
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old["meta"].get("budget") != report["meta"]["budget"]:
+            print(f"warning: budgets differ ({old['meta'].get('budget')} s vs {report['meta']['budget']} s), "
+                  f"sizes only skipped for budget in this run aren't compared")
+        regressions = compare(old, report, args.threshold)
+        for line in regressions:
+            print("REGRESSION " + line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
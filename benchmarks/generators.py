@@ -0,0 +1,62 @@
+import random
+from typing import List
+
+from editor.component import Component, Sprite, Text, VideoHolder
+
+# same canvas as editor.previewer.base, repeated here so generating a scene doesn't load pygame
+CANVAS_WIDTH = 16 * 60
+CANVAS_HEIGHT = 9 * 60
+
+HEADER = ["Song", "Genre", "Version", "Chart", "Difficulty", "Level", "Achv", "Rank", "FC/AP", "Sync",
+          "DX ★", "DX %"]
+DIFFICULTIES = ["BASIC", "ADVANCED", "EXPERT", "MASTER", "Re:MASTER"]
+GENRES = ["POPS＆ANIME", "niconico＆VOCALOID™", "東方Project", "GAME＆VARIETY", "maimai", "オンゲキ＆CHUNITHM"]
+RANKS = ["A", "AA", "AAA", "S", "S+", "SS", "SS+", "SSS", "SSS+"]
+FCAPS = ["-", "FC", "FC+", "AP", "AP+"]
+SYNCS = ["-", "FS", "FS+", "FDX", "FDX+"]
+
+
+def make_score_export(rows: int, seed: int = 0) -> str:
+    """a tab separated score export in the same layout as tests/samplescores"""
+    rng = random.Random(seed)
+    lines = ["\t".join(HEADER)]
+    for i in range(rows):
+        lines.append("\t".join([
+            f"song {i}",
+            rng.choice(GENRES),
+            "FESTiVAL PLUS",
+            rng.choice(["DX", "STD"]),
+            rng.choice(DIFFICULTIES),
+            str(rng.randint(1, 15)),
+            f"{rng.uniform(80, 101):.4f}%",
+            rng.choice(RANKS),
+            rng.choice(FCAPS),
+            rng.choice(SYNCS),
+            str(rng.randint(0, 5)),
+            f"{rng.uniform(0, 100):.1f}%",
+        ]))
+    # the parser counts tokens, so no trailing newline
+    return "\n".join(lines)
+
+
+def make_scenegraph(count: int, seed: int = 0) -> List[Component]:
+    rng = random.Random(seed)
+    scenegraph = []
+    for _ in range(count):
+        c = rng.choice([VideoHolder, Text, Sprite])()
+        c.w = rng.randint(10, 300)
+        c.h = rng.randint(10, 200)
+        c.x = rng.randint(0, CANVAS_WIDTH - c.w)
+        c.y = rng.randint(0, CANVAS_HEIGHT - c.h)
+        if isinstance(c, Text):
+            c.content = "text"
+            c.size = 12
+        elif isinstance(c, Sprite):
+            c.path = "sprite.png"
+        scenegraph.append(c)
+    return scenegraph
+
+
+def make_points(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [(rng.randrange(CANVAS_WIDTH), rng.randrange(CANVAS_HEIGHT)) for _ in range(count)]
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-import pygame
+from editor.geometry import Rect
 
 
 class ComponentVisitor(ABC):
@@ -49,4 +49,4 @@ class Sprite(Component):
 
 
 def get_component_rect(c: Component):
-    return pygame.Rect(c.x, c.y, c.w, c.h)
+    return Rect(c.x, c.y, c.w, c.h)
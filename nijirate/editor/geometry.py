@@ -0,0 +1,84 @@
+class Rect:
+    """
+    Pure python stand-in for the subset of pygame.Rect the editor logic uses, so
+    scene manipulation can be imported without loading pygame. Iterates as (x, y, w, h),
+    which pygame accepts anywhere it takes a rect style argument.
+    """
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: int, y: int, w: int, h: int):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.w
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.h
+
+    @property
+    def topleft(self):
+        return self.x, self.y
+
+    @property
+    def topright(self):
+        return self.x + self.w, self.y
+
+    @property
+    def bottomleft(self):
+        return self.x, self.y + self.h
+
+    @property
+    def bottomright(self):
+        return self.x + self.w, self.y + self.h
+
+    @property
+    def size(self):
+        return self.w, self.h
+
+    def colliderect(self, other) -> bool:
+        # same rules as pygame - empty rects never collide and edges are exclusive
+        if self.w == 0 or self.h == 0 or other.w == 0 or other.h == 0:
+            return False
+        return (min(self.x, self.x + self.w) < max(other.x, other.x + other.w) and
+                min(self.y, self.y + self.h) < max(other.y, other.y + other.h) and
+                max(self.x, self.x + self.w) > min(other.x, other.x + other.w) and
+                max(self.y, self.y + self.h) > min(other.y, other.y + other.h))
+
+    def collidepoint(self, pos) -> bool:
+        px, py = pos
+        return self.x <= px < self.x + self.w and self.y <= py < self.y + self.h
+
+    def inflate(self, dx: int, dy: int) -> "Rect":
+        # truncate towards zero like pygame does
+        return Rect(self.x - int(dx / 2), self.y - int(dy / 2), self.w + dx, self.h + dy)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.w, self.h))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.w, self.h)[i]
+
+    def __eq__(self, other):
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"<rect({self.x}, {self.y}, {self.w}, {self.h})>"
@@ -1,10 +1,15 @@
+import os
+import time
 from abc import ABC
 
 import pygame
 
+from profiling import tracer
+
 WIDTH = 16 * 60
 HEIGHT = 9 * 60
 FPS = 160
+TRACE_ENV = "NIJIRATE_TRACE"  # path to write a chrome trace of the session to on exit
 
 
 class Base(ABC):
@@ -14,6 +19,7 @@ class Base(ABC):
 
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         self.clock = pygame.time.Clock()
+        self.frametime = 0.0  # ms spent in update + draw last frame, excludes the tick sleep
 
     def update(self, events):
         pass
@@ -22,13 +28,23 @@ class Base(ABC):
         pass
 
     def run(self):
+        tracepath = os.environ.get(TRACE_ENV)
+        if tracepath:
+            tracer.enable()
         running = True
         while running:
             events = pygame.event.get()
             for event in events:
                 if event.type == pygame.QUIT:
                     running = False
-            self.update(events)
-            self.draw()
+            start = time.perf_counter()
+            with tracer.span("frame", "frame"):
+                with tracer.span("update", "frame"):
+                    self.update(events)
+                with tracer.span("draw", "frame"):
+                    self.draw()
+            self.frametime = (time.perf_counter() - start) * 1000
             self.clock.tick(FPS)
         pygame.quit()
+        if tracepath:
+            tracer.export_chrome_trace(tracepath)
@@ -2,9 +2,8 @@ import math
 from abc import ABC
 from typing import Optional
 
-import pygame.mouse
-
 from editor.component import get_component_rect, Component
+from editor.geometry import Rect
 from editor.previewer.gizmos import Corner
 from editor.state import State
 
@@ -25,7 +24,7 @@ def _get_rect_from_pts(p1, p2):
     y1 = min(b, d)
     y2 = max(b, d)
     w, h = x2 - x1, y2 - y1
-    return pygame.Rect(x1, y1, w, h)
+    return Rect(x1, y1, w, h)
 
 
 class Mode(ABC):
@@ -71,7 +70,7 @@ class ScaleMode(Mode):
     def mousepressed(self, pos, args):
         one = self.__get_one()
         self._corner = args
-        self._initrect = pygame.Rect(one.x, one.y, one.w, one.h)
+        self._initrect = Rect(one.x, one.y, one.w, one.h)
 
     def mousemotion(self, initpos, pos):
         # TODO: we aren't accounting for an offset so the corners will awkwardly snap to the cursor's position which
@@ -122,7 +121,7 @@ class SelectMode(Mode):
             if get_component_rect(node).colliderect(_get_rect_from_pts(initpos, pos)):
                 acc.append(node)
         self._state.set_selected(acc)
-        self._state.set_selection_box(pygame.Rect(0, 0, 0, 0))
+        self._state.set_selection_box(Rect(0, 0, 0, 0))
 
 
 class MouseSelector:
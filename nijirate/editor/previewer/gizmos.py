@@ -2,9 +2,8 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from typing import List, Optional
 
-import pygame
-
 from editor.component import Component, get_component_rect
+from editor.geometry import Rect
 
 BOUNDING_CORNER_SIZE = 40
 
@@ -61,9 +60,9 @@ class BoundingBox(GizmoElement):
     def get_selected(self) -> List[Component]:
         return self._selected
 
-    def get_rect(self) -> pygame.Rect:
+    def get_rect(self) -> Rect:
         (minx, miny), (maxx, maxy) = _minmax(self.get_selected())
-        return pygame.Rect(minx, miny, maxx - minx, maxy - miny)
+        return Rect(minx, miny, maxx - minx, maxy - miny)
 
     def accept(self, visitor: GizmoVisitor):
         visitor.visit_boundingbox(self)
@@ -84,7 +83,7 @@ class ScaleBox:
     def get_corner(self) -> Corner:
         return self._corner
 
-    def get_rect(self) -> pygame.Rect:
+    def get_rect(self) -> Rect:
         (right, top) = self._corner.value
         cw, ch = BOUNDING_CORNER_SIZE, BOUNDING_CORNER_SIZE
         if self.parent.get_rect().w > cw*2:
@@ -95,4 +94,4 @@ class ScaleBox:
             y = self.parent.get_rect().top if top else self.parent.get_rect().bottom - ch
         else:
             y = self.parent.get_rect().top - ch if top else self.parent.get_rect().bottom
-        return pygame.Rect(x, y, cw, ch)
+        return Rect(x, y, cw, ch)
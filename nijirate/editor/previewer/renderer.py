@@ -2,6 +2,7 @@ import pygame
 
 from editor.component import ComponentVisitor, Text, VideoHolder, Sprite
 from editor.previewer.gizmos import GizmoVisitor
+from profiling import traced, tracer
 
 WIREFRAME_OUTLINE_COLOUR = (255, 255, 255)
 WIREFRAME_TEXT_COLOUR = (100, 100, 100)
@@ -19,20 +20,38 @@ class ComponentRenderer(ComponentVisitor):
     def __init__(self, surface):
         self.surface = surface
         self.font = pygame.font.SysFont("Arial", 12)
+        self.drawcount = 0  # components drawn since the last reset, read by the hud
+        self._labels = {}  # wireframe labels never change, so render each one once
+
+    def reset_drawcount(self):
+        self.drawcount = 0
+
+    def _get_label(self, text: str):
+        label = self._labels.get(text)
+        if label is None:
+            tracer.miss("wireframe_labels")
+            label = self.font.render(text, False, WIREFRAME_TEXT_COLOUR)
+            self._labels[text] = label
+        else:
+            tracer.hit("wireframe_labels")
+        return label
 
     def draw_wireframe(self, comp, text: str):
+        self.drawcount += 1
         rect = pygame.Rect(comp.x, comp.y, comp.w, comp.h)
         pygame.draw.rect(self.surface, WIREFRAME_OUTLINE_COLOUR, rect, width=1)
         pygame.draw.line(self.surface, WIREFRAME_OUTLINE_COLOUR, rect.bottomleft, rect.topright)
-        text = self.font.render(text, False, WIREFRAME_TEXT_COLOUR)
-        self.surface.blit(text, rect.inflate(-WIREFRAME_TEXT_PADDING, -WIREFRAME_TEXT_PADDING).topleft)
+        self.surface.blit(self._get_label(text), rect.inflate(-WIREFRAME_TEXT_PADDING, -WIREFRAME_TEXT_PADDING).topleft)
 
+    @traced("ComponentRenderer.visit_text", "render")
     def visit_text(self, visitor: Text):
         self.draw_wireframe(visitor, "text")
 
+    @traced("ComponentRenderer.visit_sprite", "render")
     def visit_sprite(self, visitor: Sprite):
         self.draw_wireframe(visitor, "sprite")
 
+    @traced("ComponentRenderer.visit_video_holder", "render")
     def visit_video_holder(self, visitor: VideoHolder):
         self.draw_wireframe(visitor, "video")
 
@@ -48,6 +67,7 @@ class GizmoRenderer(GizmoVisitor):
     def __init__(self, surface):
         self.surface = surface
 
+    @traced("GizmoRenderer.visit_boundingbox", "render")
     def visit_boundingbox(self, bb):
         # computing minmax on every frame is probably comparatively expensive
         # but bounding boxes aren't necessarily drawn every frame and the complexity doesn't
@@ -56,9 +76,9 @@ class GizmoRenderer(GizmoVisitor):
         count = len(bb.get_selected())
         assert count > 0
         colour = BOUNDING_OUTLINE_COLOUR_SINGLE if count == 1 else BOUNDING_OUTLINE_COLOUR_MULTI
-        pygame.draw.rect(self.surface, colour, bb.get_rect(), width=1)
+        pygame.draw.rect(self.surface, colour, tuple(bb.get_rect()), width=1)
 
         if count > 1:  # TODO: multiscaling
             return
         for sbox in bb.get_size_boxes():
-            pygame.draw.rect(self.surface, BOUNDING_CHILD_COLOUR, sbox.get_rect(), width=1)
+            pygame.draw.rect(self.surface, BOUNDING_CHILD_COLOUR, tuple(sbox.get_rect()), width=1)
@@ -5,13 +5,18 @@ import pygame
 from editor.component import VideoHolder, Text
 from editor.previewer.control import MouseSelector
 from editor.state import State, StateObserver
-from editor.previewer.base import Base
+from editor.previewer.base import Base, HEIGHT
 from editor.previewer.renderer import ComponentRenderer, GizmoRenderer, draw_selection_box
+from profiling import tracer
+
+HUD_COLOUR = (0, 255, 0)
+HUD_LINE_HEIGHT = 14
+HUD_TOGGLE_KEY = pygame.K_F3
 
 
 class Viewer(Base, StateObserver):
 
-    def __init__(self, state: State, detached: bool = False):
+    def __init__(self, state: State, detached: bool = False, hud: bool = False):
         super().__init__()
         pygame.display.set_caption("Editor [DETACHED]" if detached else "Editor")
 
@@ -23,6 +28,8 @@ class Viewer(Base, StateObserver):
         self.controller = MouseSelector(self.state)
 
         self.font = pygame.font.SysFont("Arial", 12)
+        self.hud = False
+        self.set_hud(hud)
 
     def onmessage(self, message: (str, List[any])):
         pass
@@ -36,6 +43,13 @@ class Viewer(Base, StateObserver):
                 self.controller.domouseup(pos)
             if event.type == pygame.MOUSEMOTION:
                 self.controller.mousemotion(pos)
+            if event.type == pygame.KEYDOWN and event.key == HUD_TOGGLE_KEY:
+                self.set_hud(not self.hud)
+
+    def set_hud(self, value: bool):
+        self.hud = value
+        # the hud's hit rates only need the tracer's counters, not its spans
+        tracer.counting = value
 
     def draw_gizmos(self):
         # we'll excuse the selection box from the gizmo ecosystem for the time being
@@ -47,9 +61,22 @@ class Viewer(Base, StateObserver):
             bb.accept(self.grenderer)
 
     def draw_scenegraph(self):
+        self.crenderer.reset_drawcount()
         for c in self.state.get_scenegraph():
             c.accept(self.crenderer)
 
+    def draw_hud(self):
+        lines = [
+            f"frame {self.frametime:.2f} ms ({self.clock.get_fps():.0f} fps)",
+            f"draws {self.crenderer.drawcount}",
+        ]
+        for cache in tracer.get_caches():
+            lines.append(f"{cache} {tracer.hit_rate(cache):.0%} hit")
+        x, y = 0, HEIGHT - HUD_LINE_HEIGHT * len(lines)
+        for line in lines:
+            self.screen.blit(self.font.render(line, False, HUD_COLOUR), (x, y))
+            y += HUD_LINE_HEIGHT
+
     def draw(self):
         self.screen.fill((0, 0, 0))
 
@@ -58,6 +85,8 @@ class Viewer(Base, StateObserver):
 
         self.screen.blit(self.font.render("The editor is currently DETACHED. No communication is being made with "
                                           "other parts of the program", False, (255, 0, 0)), (0, 0))
+        if self.hud:
+            self.draw_hud()
         pygame.display.flip()
 
 
@@ -2,9 +2,8 @@ import threading
 from multiprocessing import Pipe, Lock
 from typing import List, Optional
 
-import pygame
-
 from editor.component import Component
+from editor.geometry import Rect
 from editor.previewer.gizmos import BoundingBox, get_bounding_box
 
 
@@ -15,7 +14,7 @@ class State:
         self._do_wireframe = False  # wireframe view
         self._scenegraph: List[Component] = []  # all items to be serialised -> does not include gizmos!
         self._selected: List[Component] = []  # all currently selected items
-        self._selection_box: pygame.Rect = pygame.Rect(0, 0, 0, 0)
+        self._selection_box: Rect = Rect(0, 0, 0, 0)
         self._boundingbox: Optional[BoundingBox] = None
 
     # wireframe - get set
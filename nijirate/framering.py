@@ -0,0 +1,167 @@
+import struct
+from contextlib import contextmanager
+from multiprocessing import get_context, shared_memory
+from typing import Optional
+
+from profiling import tracer
+
+# header layout, every field a little endian u64:
+#   head      sequence number of the next frame the producer will write
+#   tail      sequence number of the next frame the consumer will read
+#   finished  set once the producer has written its last frame
+#   writing   set while the producer holds a slot it hasn't published yet
+#   seqs      sequence number of the frame each slot currently holds
+_COUNTER = struct.Struct("<Q")
+_HEAD = 0
+_TAIL = 8
+_FINISHED = 16
+_WRITING = 24
+_SEQS = 32
+_ALIGN = 64
+
+
+class FrameRing:
+    """
+    A ring of frame slots in shared memory, handing frames from one producer process
+    (the composer) to one consumer process (the encoder) without copying them.
+
+    The producer draws straight into a slot inside `with ring.write() as view` and the frame
+    is handed over when the block exits. When every slot is waiting on the consumer, write
+    blocks, which is what keeps a fast renderer from running away from a slow encoder.
+
+    Create the ring in the parent and pass it to the producer and consumer processes as a
+    Process argument; the creator unlinks the shared memory on close.
+    """
+
+    def __init__(self, width: int, height: int, slots: int = 4, channels: int = 4, ctx=None):
+        ctx = get_context() if ctx is None else ctx
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.slots = slots
+        self.frame_size = width * height * channels
+        self._header_size = -(-(_SEQS + 8 * slots) // _ALIGN) * _ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=self._header_size + self.frame_size * slots)
+        self._shm.buf[:self._header_size] = bytes(self._header_size)
+        self._owner = True
+        self._free = ctx.Semaphore(slots)
+        self._filled = ctx.Semaphore(0)
+
+    def __getstate__(self):
+        # only the process that created the ring gets to unlink it
+        state = self.__dict__.copy()
+        state["_owner"] = False
+        return state
+
+    def _get(self, offset: int) -> int:
+        return _COUNTER.unpack_from(self._shm.buf, offset)[0]
+
+    def _set(self, offset: int, value: int):
+        _COUNTER.pack_into(self._shm.buf, offset, value)
+
+    def _slot_view(self, slot: int) -> memoryview:
+        start = self._header_size + slot * self.frame_size
+        return self._shm.buf[start:start + self.frame_size]
+
+    # producer
+
+    @contextmanager
+    def write(self, timeout: Optional[float] = None):
+        """yields a writable view of the next free slot, which is published on exit"""
+        if not self._free.acquire(False):
+            tracer.count("framering.stall")
+            if not self._free.acquire(timeout=timeout):
+                raise TimeoutError("framering: consumer fell behind")
+        self._set(_WRITING, 1)
+        seq = self._get(_HEAD)
+        slot = seq % self.slots
+        view = self._slot_view(slot)
+        try:
+            yield view
+        except BaseException:
+            view.release()
+            self._set(_WRITING, 0)
+            self._free.release()  # nothing was published, give the slot back
+            raise
+        view.release()
+        self._set(_SEQS + 8 * slot, seq)
+        self._set(_HEAD, seq + 1)
+        self._set(_WRITING, 0)
+        self._filled.release()
+
+    def recover_producer(self):
+        """
+        gives back the slot a producer was holding when it was killed mid write, which would
+        otherwise be lost for good. only call this once the producer is known to be dead.
+        the unpublished frame is dropped, the consumer never sees it
+        """
+        if self._get(_WRITING):
+            self._set(_WRITING, 0)
+            self._free.release()
+
+    def head(self) -> int:
+        """sequence number the next written frame will get"""
+        return self._get(_HEAD)
+
+    def surface(self, view: memoryview):
+        """
+        a pygame surface drawing straight into a slot, eg. for ComponentRenderer.
+        it borrows the slot, so drop it before the write block ends
+        """
+        import pygame
+        assert self.channels == 4
+        return pygame.image.frombuffer(view, (self.width, self.height), "RGBA")
+
+    def finish(self):
+        """marks the end of the stream, read raises EOFError once the remaining frames are drained"""
+        self._set(_FINISHED, 1)
+        self._filled.release()
+
+    # consumer
+
+    @contextmanager
+    def read(self, timeout: Optional[float] = None):
+        """yields (sequence number, read only view) of the oldest frame, freeing its slot on exit"""
+        if not self._filled.acquire(timeout=timeout):
+            raise TimeoutError("framering: no frame ready")
+        seq = self._get(_TAIL)
+        if seq == self._get(_HEAD) and self._get(_FINISHED):
+            self._filled.release()  # let any later read see the end too
+            raise EOFError("framering: producer finished")
+        slot = seq % self.slots
+        held = self._get(_SEQS + 8 * slot)
+        if held != seq:
+            self._filled.release()  # the frame stays put, leave it for whoever looks next
+            raise Exception(f"framering: slot {slot} holds frame {held}, expected {seq}")
+        writable = self._slot_view(slot)
+        view = writable.toreadonly()
+        try:
+            yield seq, view
+        finally:
+            view.release()
+            writable.release()
+            self._set(_TAIL, seq + 1)
+            self._free.release()
+
+    def frames(self, timeout: Optional[float] = None):
+        """iterates (sequence number, view) until the producer finishes"""
+        while True:
+            try:
+                with self.read(timeout) as frame:
+                    yield frame
+            except EOFError:
+                return
+
+    # lifecycle
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
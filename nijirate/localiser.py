@@ -0,0 +1,195 @@
+import hashlib
+import mmap
+import os
+import string
+import struct
+from typing import Dict, List, Optional, Union
+
+LANG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lang")
+CATALOG_EXT = ".cat"
+DEFAULT_LANGUAGE = "en"
+
+# catalog layout (little endian), built by scripts/localisation.py:
+#   header  magic, version, entry count, table size (power of 2)
+#   table   open addressed hash table of (hash, key offset, key length, value offset, value length)
+#   blob    utf-8 keys and values the table points into
+MAGIC = b"NJLC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHxxII")
+_ENTRY = struct.Struct("<QIIII")
+_EMPTY = 0xFFFFFFFF  # key offset of an unused slot
+
+
+def key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+_FORMATTER = string.Formatter()
+
+
+class CompiledFormat:
+    """
+    a format string split into literals and fields once, so rendering it is a walk over
+    the pieces rather than a reparse of the template like str.format does on every call
+    """
+    __slots__ = ("_pieces",)
+
+    def __init__(self, template: str):
+        pieces = []
+        for literal, field, spec, conversion in _FORMATTER.parse(template):
+            if literal:
+                pieces.append(literal)
+            if field is not None:
+                # nested fields in the spec ({x:{width}}) are filled in at render time
+                pieces.append((field, field.isidentifier(), spec, conversion, "{" in spec))
+        self._pieces = tuple(pieces)
+
+    def __call__(self, **kwargs) -> str:
+        out = []
+        for piece in self._pieces:
+            if piece.__class__ is str:
+                out.append(piece)
+                continue
+            field, plain, spec, conversion, nested = piece
+            value = kwargs[field] if plain else _FORMATTER.get_field(field, (), kwargs)[0]
+            if conversion is not None:
+                value = _FORMATTER.convert_field(value, conversion)
+            out.append(format(value, spec.format(**kwargs) if nested else spec))
+        return "".join(out)
+
+
+def compile_format(template: str) -> Union[str, CompiledFormat]:
+    """templates without any fields compile down to the finished string"""
+    compiled = CompiledFormat(template)
+    if all(p.__class__ is str for p in compiled._pieces):
+        return "".join(compiled._pieces)  # parse has already unescaped {{ and }}
+    return compiled
+
+
+def parse_language(text: str) -> Dict[str, str]:
+    """
+    parses a language file: one `key = value` per line, # comments, \\n for newlines.
+    values are str.format strings
+    """
+    entries = {}
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            raise Exception(f"parse_language: line {lineno} is not of the form key = value")
+        if key in entries:
+            raise Exception(f"parse_language: duplicate key {key} on line {lineno}")
+        entries[key] = value.strip().replace("\\n", "\n")
+    return entries
+
+
+def write_catalog(path: str, entries: Dict[str, str]):
+    size = 1
+    while size < len(entries) * 2:
+        size *= 2
+    table = [None] * size
+    blob = bytearray()
+    for key, value in entries.items():
+        kbytes, vbytes = key.encode("utf-8"), value.encode("utf-8")
+        h = key_hash(kbytes)
+        slot = h & (size - 1)
+        while table[slot] is not None:
+            slot = (slot + 1) & (size - 1)
+        koff = len(blob)
+        blob += kbytes
+        voff = len(blob)
+        blob += vbytes
+        table[slot] = (h, koff, len(kbytes), voff, len(vbytes))
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries), size))
+        for entry in table:
+            f.write(_ENTRY.pack(*entry) if entry is not None else _ENTRY.pack(0, _EMPTY, 0, 0, 0))
+        f.write(blob)
+
+
+class Catalog:
+    """a compiled language, memory mapped and looked up in place"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._size = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise Exception(f"catalog: {path} is not a version {VERSION} catalog, rebuild with "
+                            f"scripts/localisation.py")
+        self._blob = _HEADER.size + _ENTRY.size * self._size
+        # values are compiled the first time a key is asked for and kept from then on,
+        # misses included so an unknown key isn't hashed and probed on every frame
+        self._compiled: Dict[str, Union[str, CompiledFormat, None]] = {}
+
+    def lookup(self, key: str) -> Optional[str]:
+        kbytes = key.encode("utf-8")
+        h = key_hash(kbytes)
+        mask = self._size - 1
+        slot = h & mask
+        for _ in range(self._size):
+            eh, koff, klen, voff, vlen = _ENTRY.unpack_from(self._map, _HEADER.size + slot * _ENTRY.size)
+            if koff == _EMPTY:
+                return None
+            if eh == h and self._map[self._blob + koff:self._blob + koff + klen] == kbytes:
+                return self._map[self._blob + voff:self._blob + voff + vlen].decode("utf-8")
+            slot = (slot + 1) & mask
+        return None
+
+    def get_compiled(self, key: str) -> Union[str, CompiledFormat, None]:
+        """the compiled value for key, a plain string if it has no fields, None if there's no such key"""
+        try:
+            return self._compiled[key]
+        except KeyError:
+            pass
+        value = self.lookup(key)
+        compiled = compile_format(value) if value is not None else None
+        self._compiled[key] = compiled
+        return compiled
+
+    def close(self):
+        self._compiled.clear()
+        self._map.close()
+
+
+class Localiser:
+    def __init__(self, directory: str = LANG_DIR, language: str = DEFAULT_LANGUAGE):
+        self._directory = directory
+        self._catalogs: Dict[str, Catalog] = {}
+        self._language = None
+        self._active: Optional[Catalog] = None
+        self.set_language(language)
+
+    def available(self) -> List[str]:
+        return sorted(f[:-len(CATALOG_EXT)] for f in os.listdir(self._directory) if f.endswith(CATALOG_EXT))
+
+    def get_language(self) -> str:
+        return self._language
+
+    def set_language(self, language: str):
+        # catalogs stay mapped after switching away, so switching back is free
+        catalog = self._catalogs.get(language)
+        if catalog is None:
+            catalog = Catalog(os.path.join(self._directory, language + CATALOG_EXT))
+            self._catalogs[language] = catalog
+        self._language = language
+        self._active = catalog
+
+    def get(self, key: str, **kwargs) -> str:
+        """the localised string for key, formatted with kwargs. unknown keys come back as the key itself"""
+        compiled = self._active.get_compiled(key)
+        if compiled is None:
+            return key
+        if compiled.__class__ is str:
+            return compiled
+        return compiled(**kwargs)
+
+    def close(self):
+        for catalog in self._catalogs.values():
+            catalog.close()
+        self._catalogs.clear()
+        self._active = None
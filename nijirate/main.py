@@ -1,4 +1,46 @@
+import argparse
+import os
+import threading
+
+from service import DEFAULT_ADDRESS, RenderService, ResourceLimits
+
+
 class Main:
     """
     Primary entry point for the program
     """
+
+    @staticmethod
+    def serve(address=DEFAULT_ADDRESS, authkey: bytes = None, workers: int = 2, backlog: int = 8,
+              tenant_limit: int = None, limits: ResourceLimits = None):
+        """runs the render service in the foreground until interrupted"""
+        with RenderService(workers=workers, backlog=backlog, tenant_limit=tenant_limit, limits=limits) as service:
+            host, port = service.serve(address, authkey)
+            print(f"serving on {host}:{port} with {workers} workers")
+            # wait in short steps rather than forever so ctrl+c gets through on windows too
+            stop = threading.Event()
+            try:
+                while not stop.wait(1):
+                    pass
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--serve", action="store_true", help="run as a local render service")
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backlog", type=int, default=8)
+    parser.add_argument("--tenant-limit", type=int)
+    parser.add_argument("--timeout", type=float, help="wall clock seconds a job may take")
+    parser.add_argument("--cpu-seconds", type=int, help="cpu seconds a job may use")
+    parser.add_argument("--memory-bytes", type=int, help="cap on each worker's whole address space")
+    args = parser.parse_args()
+    if args.serve:
+        # the service unpickles whatever clients send, so it only talks to clients that know the key
+        key = os.environ.get("NIJIRATE_SERVICE_KEY")
+        if not key:
+            parser.error("set NIJIRATE_SERVICE_KEY to the key clients will connect with")
+        Main.serve((DEFAULT_ADDRESS[0], args.port), key.encode("utf-8"), args.workers, args.backlog,
+                   args.tenant_limit, ResourceLimits(args.timeout, args.cpu_seconds, args.memory_bytes))
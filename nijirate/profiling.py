@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional
+
+
+class _NullSpan:
+    # shared by every span taken while tracing is disabled so the
+    # disabled path is a single attribute check and no allocation
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_cat", "_start")
+
+    def __init__(self, tracer, name: str, cat: str):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._tracer._record(self._name, self._cat, self._start, time.perf_counter_ns())
+        return False
+
+
+class Tracer:
+    """
+    Collects timing spans and counters. Disabled by default, in which case
+    spans are no-ops and counters are not touched. counting switches on the
+    counters alone, which unlike spans don't grow with every frame
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.counting = False
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter_ns()
+        self._events: List[dict] = []
+        self._counters: Dict[str, int] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+            self._counters = {}
+            self._epoch = time.perf_counter_ns()
+
+    # spans
+
+    def span(self, name: str, cat: str = "nijirate"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat)
+
+    def _record(self, name, cat, start, end):
+        # chrome trace timestamps are in microseconds
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self._epoch) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def get_events(self) -> List[dict]:
+        with self._lock:
+            return list(self._events)
+
+    # counters
+
+    def count(self, name: str, n: int = 1):
+        if not (self.enabled or self.counting):
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def get_counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def hit(self, cache: str):
+        self.count(cache + ".hit")
+
+    def miss(self, cache: str):
+        self.count(cache + ".miss")
+
+    def get_caches(self) -> List[str]:
+        with self._lock:
+            names = list(self._counters.keys())
+        return sorted({n.rpartition(".")[0] for n in names if n.endswith((".hit", ".miss"))})
+
+    def hit_rate(self, cache: str) -> Optional[float]:
+        hits, misses = self.get_counter(cache + ".hit"), self.get_counter(cache + ".miss")
+        if hits + misses == 0:
+            return None
+        return hits / (hits + misses)
+
+    # export
+
+    def to_chrome_trace(self) -> dict:
+        now = (time.perf_counter_ns() - self._epoch) / 1000
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+        for name, value in counters.items():
+            events.append({"name": name, "ph": "C", "ts": now, "pid": os.getpid(), "args": {"value": value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        """writes everything collected so far as chrome trace-event json (chrome://tracing, perfetto)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None, cat: str = "nijirate"):
+    """decorator wrapping every call of a function in a span on the global tracer"""
+    def decorator(func):
+        spanname = func.__qualname__ if name is None else name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, spanname, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
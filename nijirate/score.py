@@ -1,6 +1,8 @@
 from enum import Enum
 import re
 
+from profiling import traced
+
 
 class Difficulty(Enum):
     # not including easy for now
@@ -49,6 +51,7 @@ class ScoreParser:
     def __init__(self, inputStr: str):
         self.input = inputStr
 
+    @traced("ScoreParser.parse", "parse")
     def parse(self) -> [Score]:
         # seems to be coping fine without accounting for crlf
         tokens = re.split(r"\t|\n", self.input)[12:]  # ignore the first 12 tokens ie. the headers
@@ -0,0 +1,481 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener, wait
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # windows has no rlimits, jobs there only get the wall clock timeout
+    resource = None
+
+from framering import FrameRing
+from profiling import tracer
+
+DEFAULT_ADDRESS = ("127.0.0.1", 7878)
+
+_READY = "ready"
+RING_WRITE_TIMEOUT = 5.0  # seconds a frame job waits on a full ring before failing
+MAX_WARMUP_FAILURES = 3  # replacement workers in a row that may die warming up before the service gives up
+
+
+class ServiceBusy(Exception):
+    """the job queue, or the tenant's share of it, is full. try again later"""
+
+
+class JobFailed(Exception):
+    pass
+
+
+class ResourceLimits:
+    """
+    per job limits, all of which fail the job with JobFailed and replace its worker with a
+    freshly warmed one.
+
+    timeout     wall clock seconds, enforced by the service
+    cpu_seconds cpu time the job may use on top of what its worker has used so far
+    memory_bytes cap on the worker's whole address space (RLIMIT_AS), not a budget for the
+                job alone. it includes everything warmup loaded (pygame, SDL, fonts...), so
+                it has to be set well above a warm worker's footprint
+    """
+
+    def __init__(self, timeout: Optional[float] = None, cpu_seconds: Optional[int] = None,
+                 memory_bytes: Optional[int] = None):
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+
+    def capped(self, other: Optional["ResourceLimits"]) -> "ResourceLimits":
+        """the stricter of each limit here and in other, so other can tighten but never loosen these"""
+        if other is None:
+            return self
+
+        def stricter(a, b):
+            return b if a is None else a if b is None else min(a, b)
+        return ResourceLimits(stricter(self.timeout, other.timeout),
+                              stricter(self.cpu_seconds, other.cpu_seconds),
+                              stricter(self.memory_bytes, other.memory_bytes))
+
+
+def warm_renderer(ring: Optional[FrameRing] = None):
+    """
+    default warmup, runs once per worker process. everything expensive to set up belongs
+    here so that jobs only pay for their own work.
+
+    frame jobs send the rendered frame back through the pipe, unless the service was given
+    a FrameRing (RenderService(ring=...)), in which case they draw straight into the next
+    slot and return its sequence number
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from editor.previewer.base import WIDTH, HEIGHT
+    from editor.previewer.renderer import ComponentRenderer
+    from score import ScoreParser
+
+    pygame.init()
+    pygame.font.init()
+    if ring is not None and (ring.width, ring.height) != (WIDTH, HEIGHT):
+        raise Exception(f"service: ring frames are {ring.width}x{ring.height}, the renderer draws {WIDTH}x{HEIGHT}")
+    surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    renderer = ComponentRenderer(surface)
+
+    def draw(target, components):
+        renderer.surface = target
+        target.fill((0, 0, 0, 0))
+        for c in components:
+            c.accept(renderer)
+        renderer.surface = surface
+
+    def handle(job):
+        kind, args = job
+        if kind == "parse":
+            return ScoreParser(args).parse()
+        if kind == "frame" and ring is None:
+            draw(surface, args)
+            return pygame.image.tostring(surface, "RGBA")
+        if kind == "frame":
+            with ring.write(RING_WRITE_TIMEOUT) as view:
+                target = ring.surface(view)
+                draw(target, args)
+                del target  # it borrows the slot, which can't be published while that's alive
+            return ring.head() - 1
+        raise Exception(f"service: no such job kind {kind}")
+    return handle
+
+
+def _apply_limits(limits: Optional[ResourceLimits]):
+    if resource is None:
+        return
+    # soft limits only, the hard limits stay put so the next job can raise them again
+    _, cpuhard = resource.getrlimit(resource.RLIMIT_CPU)
+    _, memhard = resource.getrlimit(resource.RLIMIT_AS)
+    cpusoft, memsoft = cpuhard, memhard
+    if limits is not None and limits.cpu_seconds is not None:
+        # RLIMIT_CPU counts the whole life of the process, not just this job
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpusoft = int(usage.ru_utime + usage.ru_stime) + limits.cpu_seconds
+        if cpuhard != resource.RLIM_INFINITY:
+            cpusoft = min(cpusoft, cpuhard)
+    if limits is not None and limits.memory_bytes is not None:
+        memsoft = limits.memory_bytes if memhard == resource.RLIM_INFINITY else min(limits.memory_bytes, memhard)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpusoft, cpuhard))
+    resource.setrlimit(resource.RLIMIT_AS, (memsoft, memhard))
+
+
+def _worker_main(conn, warmup):
+    handler = warmup()
+    conn.send(_READY)
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        jobid, payload, limits = msg
+        _apply_limits(limits)
+        try:
+            result = handler(payload)
+        except MemoryError:
+            # the address space cap can trip halfway through anything, so don't trust this
+            # process with another job. the last field asks the service to replace it
+            conn.send((jobid, False, "MemoryError: job went over the worker's memory_bytes", True))
+            return
+        except Exception as e:
+            # the exception itself may not survive pickling, send a description instead
+            conn.send((jobid, False, f"{type(e).__name__}: {e}", False))
+            continue
+        conn.send((jobid, True, result, False))
+
+
+class _Job:
+    def __init__(self, jobid: int, tenant: str, payload, limits: Optional[ResourceLimits]):
+        self.id = jobid
+        self.tenant = tenant
+        self.payload = payload
+        self.limits = limits
+        self.future = Future()
+
+
+class _Worker:
+    def __init__(self, ctx, warmup):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, warmup), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.job: Optional[_Job] = None
+        self.deadline: Optional[float] = None
+
+    def idle(self):
+        return self.ready and self.job is None
+
+    def assign(self, job: _Job):
+        self.job = job
+        timeout = job.limits.timeout if job.limits is not None else None
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.conn.send((job.id, job.payload, job.limits))
+
+    def finish(self) -> _Job:
+        job = self.job
+        self.job = None
+        self.deadline = None
+        return job
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RenderService:
+    """
+    A pool of pre-warmed worker processes that render jobs are handed to.
+
+    Each worker runs warmup once when it starts (pygame, fonts, ...) and then serves jobs
+    for as long as it lives. At most backlog jobs wait for a worker; past that, and past
+    tenant_limit jobs in flight per tenant, submit pushes back with ServiceBusy. limits is
+    the ceiling for every job; limits passed to submit can only tighten it.
+
+    Given a FrameRing, warmup is called with it and the pool is its single producer: only
+    one worker is allowed, and a worker killed mid frame has its ring slot handed back.
+    """
+
+    def __init__(self, warmup: Callable[[], Callable] = warm_renderer, workers: int = 2, backlog: int = 8,
+                 tenant_limit: Optional[int] = None, limits: Optional[ResourceLimits] = None,
+                 start_method: str = "spawn", ring: Optional[FrameRing] = None):
+        if workers < 1:
+            raise Exception("service: need at least one worker")
+        if isinstance(warmup, partial) and any(isinstance(a, FrameRing)
+                                               for a in (*warmup.args, *warmup.keywords.values())):
+            raise Exception("service: pass the FrameRing as ring= so the service can look after it")
+        if ring is not None:
+            # a ring has a single producer, and the service has to recover the ring when it
+            # kills that producer mid write
+            if workers != 1:
+                raise Exception("service: a FrameRing can only be fed by a single worker")
+            warmup = partial(warmup, ring)
+        if backlog < 1:
+            # queue.Queue treats 0 as unbounded, which would switch off backpressure
+            raise Exception("service: backlog must be at least 1")
+        self._ctx = get_context(start_method)
+        self._ring = ring
+        self._warmup = warmup
+        self._nworkers = workers
+        self._tenant_limit = tenant_limit
+        self._limits = limits
+
+        self._jobs = queue.Queue(maxsize=backlog)
+        self._ids = itertools.count()
+        self._inflight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._workers: List[_Worker] = []
+        self._wake_r, self._wake_w = self._ctx.Pipe(duplex=False)
+        self._wakelock = threading.Lock()
+        self._running = False
+        self._halted: Optional[str] = None  # why the dispatcher stopped the service, if it did
+        self._warmup_failures = 0
+        self._dispatcher = None
+        self._listeners: List[Listener] = []
+
+    # lifecycle
+
+    def start(self, timeout: Optional[float] = None):
+        """spawns the workers and blocks until every one of them is warm"""
+        self._workers = [_Worker(self._ctx, self._warmup) for _ in range(self._nworkers)]
+        for w in self._workers:
+            try:
+                ready = w.conn.poll(timeout) and w.conn.recv() == _READY
+            except EOFError:
+                ready = False
+            if not ready:
+                w.process.join(1)
+                code = w.process.exitcode
+                for other in self._workers:
+                    self._kill(other)
+                self._workers = []
+                raise Exception(f"service: worker failed to warm up (exit code {code})")
+            w.ready = True
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def shutdown(self):
+        self._running = False
+        self._wake()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        for listener in self._listeners:
+            listener.close()
+        for w in self._workers:
+            if w.job is not None:
+                w.finish().future.set_exception(JobFailed("service shut down"))
+            try:
+                w.conn.send(None)
+            except OSError:
+                pass
+            w.process.join(1)
+            if w.process.is_alive():
+                self._kill(w)
+        self._workers = []
+        self._drain("service shut down")
+
+    def _drain(self, reason: str):
+        while True:
+            try:
+                self._jobs.get_nowait().future.set_exception(JobFailed(reason))
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+    # jobs
+
+    def submit(self, payload, tenant: str = "default", limits: Optional[ResourceLimits] = None,
+               block: bool = True, timeout: Optional[float] = None) -> Future:
+        if not self._running:
+            raise Exception(f"service: stopped, {self._halted}" if self._halted else "service: not running")
+        if self._limits is not None:
+            limits = self._limits.capped(limits)
+        job = _Job(next(self._ids), tenant, payload, limits)
+        with self._lock:
+            inflight = self._inflight.get(tenant, 0)
+            if self._tenant_limit is not None and inflight >= self._tenant_limit:
+                raise ServiceBusy(f"tenant {tenant} already has {inflight} jobs in flight")
+            self._inflight[tenant] = inflight + 1
+        job.future.add_done_callback(lambda _: self._release(tenant))
+        try:
+            self._jobs.put(job, block, timeout)
+        except queue.Full:
+            job.future.cancel()
+            raise ServiceBusy("job queue is full")
+        if not self._running:
+            self._drain(self._halted or "service shut down")  # stopped while we were queueing
+        self._wake()
+        return job.future
+
+    def _release(self, tenant):
+        with self._lock:
+            self._inflight[tenant] -= 1
+
+    def _wake(self):
+        with self._wakelock:
+            self._wake_w.send_bytes(b"")
+
+    def _dispatch(self):
+        while self._running:
+            for i, w in enumerate(self._workers):
+                if not w.idle():
+                    continue
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        w.assign(job)
+                    except OSError:
+                        self._replace(i, "worker died before taking the job")
+
+            deadlines = [w.deadline for w in self._workers if w.deadline is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = wait([self._wake_r] + [w.conn for w in self._workers], timeout)
+            if self._wake_r in ready:
+                while self._wake_r.poll():
+                    self._wake_r.recv_bytes()
+
+            for i, w in enumerate(self._workers):
+                if w.conn in ready:
+                    try:
+                        msg = w.conn.recv()
+                    except (EOFError, OSError):
+                        # rlimits kill the worker outright
+                        w.process.join(1)
+                        reason = f"worker exited with code {w.process.exitcode}"
+                        if not w.ready:
+                            self._warmup_failures += 1
+                            if self._warmup_failures >= MAX_WARMUP_FAILURES:
+                                self._halt(f"{self._warmup_failures} workers in a row failed to warm up ({reason})")
+                                return
+                        self._replace(i, reason)
+                        continue
+                    if msg == _READY:
+                        w.ready = True
+                        self._warmup_failures = 0
+                        continue
+                    jobid, ok, result, retire = msg
+                    job = w.finish()
+                    if ok:
+                        job.future.set_result(result)
+                    else:
+                        job.future.set_exception(JobFailed(result))
+                    if retire:
+                        self._replace(i, reason="")
+                elif w.deadline is not None and time.monotonic() >= w.deadline:
+                    self._replace(i, "job timed out")
+
+    def _halt(self, reason: str):
+        """stops the service from the dispatcher, failing everything queued or running"""
+        self._halted = reason
+        self._running = False
+        for w in self._workers:
+            if w.job is not None:
+                w.finish().future.set_exception(JobFailed(reason))
+            self._kill(w)
+        self._workers = []
+        self._drain(reason)
+
+    def _kill(self, w: _Worker):
+        w.kill()
+        if self._ring is not None:
+            # it may have died holding a slot, which nothing else would ever give back
+            self._ring.recover_producer()
+
+    def _replace(self, i: int, reason: str):
+        w = self._workers[i]
+        job = w.finish()
+        self._kill(w)
+        tracer.count("service.worker_replaced")
+        # the replacement warms up in the background and reports ready to the dispatcher
+        self._workers[i] = _Worker(self._ctx, self._warmup)
+        if job is not None:
+            job.future.set_exception(JobFailed(reason))
+
+    # local socket
+
+    def serve(self, address=DEFAULT_ADDRESS, authkey: bytes = None, tenant: str = "default"):
+        """
+        accepts jobs from RenderClients on a local socket until shutdown. returns the bound address.
+
+        authkey is required since requests are unpickled. every client that authenticates with
+        it counts as tenant, so clients can't pick their own tenant to dodge tenant_limit;
+        serve once per tenant, each with its own address and key
+        """
+        if not authkey:
+            raise Exception("service: serve needs an authkey")
+        listener = Listener(address, authkey=authkey)
+        self._listeners.append(listener)
+        threading.Thread(target=self._accept, args=(listener, tenant), daemon=True).start()
+        return listener.address
+
+    def _accept(self, listener, tenant):
+        while self._running:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return  # listener closed
+            except Exception:
+                continue  # failed handshake
+            threading.Thread(target=self._session, args=(conn, tenant), daemon=True).start()
+
+    def _session(self, conn, tenant):
+        with conn:
+            while True:
+                try:
+                    payload, limits = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self.submit(payload, tenant, limits, block=False).result())
+                except ServiceBusy as e:
+                    reply = ("busy", str(e))
+                except Exception as e:
+                    reply = ("error", str(e))
+                conn.send(reply)
+
+
+class RenderClient:
+    def __init__(self, address=DEFAULT_ADDRESS, authkey: bytes = None):
+        self._conn = Client(address, authkey=authkey)
+
+    def render(self, payload, limits: Optional[ResourceLimits] = None):
+        """limits can only tighten the ones the service was started with"""
+        self._conn.send((payload, limits))
+        status, result = self._conn.recv()
+        if status == "busy":
+            raise ServiceBusy(result)
+        if status == "error":
+            raise JobFailed(result)
+        return result
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
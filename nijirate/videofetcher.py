@@ -1,5 +1,6 @@
 from typing import List
 
+from profiling import traced
 from score import Score
 
 
@@ -7,5 +8,6 @@ class VideoFetcher:
     def __init__(self, scores: List[Score]):
         self.scores = scores
 
+    @traced("VideoFetcher.kickoff", "fetch")
     def kickoff(self, threadcount=4):
         pass
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Checks that every language file in lang/ defines the same keys with the same format placeholders.
+
+    python scripts/langcheck.py [langdir]
+"""
+import os
+import string
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nijirate"))
+
+from localiser import DEFAULT_LANGUAGE, LANG_DIR, parse_language  # noqa: E402
+
+
+def read_languages(langdir: str = LANG_DIR) -> Dict[str, Dict[str, str]]:
+    """every language file in langdir, ie. the files without an extension"""
+    languages = {}
+    for name in sorted(os.listdir(langdir)):
+        path = os.path.join(langdir, name)
+        if name.startswith(".") or "." in name or not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            languages[name] = parse_language(f.read())
+    return languages
+
+
+def _fields(value: str) -> List[str]:
+    """the root name of every field in value, including fields nested in format specs"""
+    names = []
+    for _, field, spec, _ in string.Formatter().parse(value):
+        if field is not None:
+            names.append(field.partition(".")[0].partition("[")[0])
+            if spec:
+                names.extend(_fields(spec))
+    return names
+
+
+def _placeholders(value: str):
+    names = set(_fields(value))
+    # Localiser.get only takes keyword arguments, so {} and {0} could never be filled in
+    positional = sorted(n for n in names if not n.isidentifier())
+    if positional:
+        raise ValueError(f"positional fields {positional} can't be filled, name them")
+    return names
+
+
+def check(languages: Dict[str, Dict[str, str]], reference: str = DEFAULT_LANGUAGE) -> List[str]:
+    """returns a list of problems, empty if the languages are in parity"""
+    problems = []
+    allkeys = set()
+    for entries in languages.values():
+        allkeys.update(entries.keys())
+    for lang, entries in languages.items():
+        for key in sorted(allkeys - entries.keys()):
+            problems.append(f"{lang}: missing {key}")
+        for key, value in entries.items():
+            try:
+                _placeholders(value)
+            except ValueError as e:
+                problems.append(f"{lang}: {key} is not a valid format string ({e})")
+    ref = languages.get(reference)
+    if ref is None:
+        return problems
+    for lang, entries in languages.items():
+        for key in sorted(ref.keys() & entries.keys()):
+            try:
+                expected, actual = _placeholders(ref[key]), _placeholders(entries[key])
+            except ValueError:
+                continue  # already reported
+            if expected != actual:
+                problems.append(f"{lang}: {key} has placeholders {sorted(actual)}, "
+                                f"{reference} has {sorted(expected)}")
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    problems = check(read_languages(argv[0] if argv else LANG_DIR))
+    for p in problems:
+        print(p)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
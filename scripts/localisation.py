@@ -0,0 +1,43 @@
+"""
+Compiles every language file in lang/ into a <language>.cat catalog for nijirate/localiser.py.
+Refuses to build if langcheck finds the languages out of parity.
+
+    python scripts/localisation.py [langdir] [outdir]
+"""
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nijirate"))
+
+from langcheck import check, read_languages  # noqa: E402
+from localiser import CATALOG_EXT, LANG_DIR, write_catalog  # noqa: E402
+
+
+def build(langdir: str = LANG_DIR, outdir: str = LANG_DIR) -> List[str]:
+    languages = read_languages(langdir)
+    problems = check(languages)
+    if problems:
+        raise Exception("localisation: languages are out of parity\n" + "\n".join(problems))
+    os.makedirs(outdir, exist_ok=True)
+    written = []
+    for lang, entries in languages.items():
+        path = os.path.join(outdir, lang + CATALOG_EXT)
+        write_catalog(path, entries)
+        written.append(path)
+    return written
+
+
+def main(argv: List[str]) -> int:
+    try:
+        written = build(*argv[:2])
+    except Exception as e:
+        print(e)
+        return 1
+    for path in written:
+        print(f"wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,123 @@
+import time
+from multiprocessing import get_context
+from unittest import TestCase
+
+from framering import _SEQS, FrameRing
+
+WIDTH, HEIGHT = 32, 18
+FRAMES = 50
+
+
+def produce(ring: FrameRing):
+    for i in range(FRAMES):
+        with ring.write(timeout=10) as view:
+            view[:] = bytes([i % 256]) * ring.frame_size
+    ring.finish()
+    ring.close()
+
+
+def die_writing(ring: FrameRing, writing):
+    with ring.write(timeout=10):
+        writing.set()
+        time.sleep(60)
+
+
+class TestFrameRing(TestCase):
+    def testRoundTrip(self):
+        with FrameRing(WIDTH, HEIGHT, slots=2) as ring:
+            with ring.write() as view:
+                view[:4] = b"\x01\x02\x03\x04"
+            with ring.read() as (seq, view):
+                self.assertEqual(seq, 0)
+                self.assertEqual(bytes(view[:4]), b"\x01\x02\x03\x04")
+                self.assertEqual(len(view), WIDTH * HEIGHT * 4)
+            with ring.write() as view:
+                view[0] = 9
+            with ring.read() as (seq, view):
+                self.assertEqual((seq, view[0]), (1, 9))
+
+    def testBackpressure(self):
+        with FrameRing(WIDTH, HEIGHT, slots=2) as ring:
+            for _ in range(2):
+                with ring.write():
+                    pass
+            with self.assertRaises(TimeoutError):
+                with ring.write(timeout=0.1):
+                    pass
+            with ring.read():
+                pass
+            with ring.write(timeout=0.1):
+                pass
+
+    def testAbandonedWrite(self):
+        with FrameRing(WIDTH, HEIGHT, slots=1) as ring:
+            with self.assertRaises(ValueError):
+                with ring.write():
+                    raise ValueError()
+            with self.assertRaises(TimeoutError):
+                with ring.read(timeout=0.1):
+                    pass
+            with ring.write(timeout=0.1):
+                pass
+
+    def testFinish(self):
+        with FrameRing(WIDTH, HEIGHT, slots=2) as ring:
+            with ring.write():
+                pass
+            ring.finish()
+            self.assertEqual([seq for seq, _ in ring.frames(1)], [0])
+            with self.assertRaises(EOFError):
+                with ring.read(1):
+                    pass
+
+    def testSequenceMismatch(self):
+        with FrameRing(WIDTH, HEIGHT, slots=2) as ring:
+            with ring.write():
+                pass
+            ring._set(_SEQS, 5)  # corrupt slot 0's sequence number
+            with self.assertRaises(Exception):
+                with ring.read(0.1):
+                    pass
+            # the permit went back, so the frame is still there to read once it's sane again
+            ring._set(_SEQS, 0)
+            with ring.read(0.1) as (seq, _):
+                self.assertEqual(seq, 0)
+
+    def testAcrossProcesses(self):
+        ctx = get_context("spawn")
+        with FrameRing(WIDTH, HEIGHT, slots=3, ctx=ctx) as ring:
+            producer = ctx.Process(target=produce, args=(ring,))
+            producer.start()
+            seen = []
+            for seq, view in ring.frames(10):
+                self.assertEqual(bytes(view[:1]) * ring.frame_size, bytes(view))
+                self.assertEqual(view[0], seq % 256)
+                seen.append(seq)
+            producer.join(10)
+            self.assertEqual(seen, list(range(FRAMES)))
+
+    def testProducerKilledMidWrite(self):
+        ctx = get_context("spawn")
+        with FrameRing(WIDTH, HEIGHT, slots=1, ctx=ctx) as ring:
+            writing = ctx.Event()
+            producer = ctx.Process(target=die_writing, args=(ring, writing))
+            producer.start()
+            self.assertTrue(writing.wait(10))
+            producer.kill()
+            producer.join(10)
+            # the dead producer took the only slot with it
+            with self.assertRaises(TimeoutError):
+                with ring.write(timeout=0.1):
+                    pass
+            ring.recover_producer()
+            with ring.write(timeout=0.1) as view:
+                view[0] = 7
+            with ring.read(0.1) as (seq, view):
+                self.assertEqual((seq, view[0]), (0, 7))
+            # a second recover with nothing held must not hand out an extra slot
+            ring.recover_producer()
+            with ring.write(timeout=0.1):
+                pass
+            with self.assertRaises(TimeoutError):
+                with ring.write(timeout=0.1):
+                    pass
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from editor.geometry import Rect
+
+
+class TestRect(TestCase):
+    def testEdges(self):
+        r = Rect(10, 20, 30, 40)
+        self.assertEqual((r.left, r.top, r.right, r.bottom), (10, 20, 40, 60))
+        self.assertEqual(r.topright, (40, 20))
+        self.assertEqual(r.bottomleft, (10, 60))
+        x, y, w, h = r
+        self.assertEqual((x, y, w, h), (10, 20, 30, 40))
+
+    def testCollidePoint(self):
+        r = Rect(0, 0, 10, 10)
+        self.assertTrue(r.collidepoint((0, 0)))
+        self.assertTrue(r.collidepoint((9, 9)))
+        self.assertFalse(r.collidepoint((10, 5)))
+
+    def testCollideRect(self):
+        r = Rect(0, 0, 10, 10)
+        self.assertTrue(r.colliderect(Rect(5, 5, 10, 10)))
+        self.assertFalse(r.colliderect(Rect(10, 0, 10, 10)))  # touching edges don't collide
+        self.assertFalse(r.colliderect(Rect(5, 5, 0, 0)))  # empty rects never collide
+
+    def testInflate(self):
+        self.assertEqual(Rect(10, 10, 20, 20).inflate(-10, -10), Rect(15, 15, 10, 10))
+
+
+class TestHeadlessImport(TestCase):
+    def testNoPygame(self):
+        # scoring and scene manipulation must not drag pygame in
+        code = ("import sys; sys.path.insert(0, 'nijirate');"
+                "import score, editor.state, editor.previewer.control, editor.previewer.gizmos;"
+                "sys.exit('pygame' in sys.modules)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=root).returncode, 0)
@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+from unittest import TestCase
+
+from localiser import CompiledFormat, Localiser, compile_format, parse_language, write_catalog
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import localisation  # noqa: E402
+
+
+class TestLocaliser(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dir = self._dir.name
+        write_catalog(os.path.join(self.dir, "en.cat"), {
+            "greeting": "hello {name}",
+            "plain": "plain",
+            **{f"key{i}": f"value {i}" for i in range(100)},
+        })
+        write_catalog(os.path.join(self.dir, "jp.cat"), {
+            "greeting": "こんにちは{name}さん",
+            "plain": "プレーン",
+        })
+        self.loc = Localiser(self.dir, "en")
+
+    def tearDown(self):
+        self.loc.close()
+        self._dir.cleanup()
+
+    def testLookup(self):
+        self.assertEqual(self.loc.get("plain"), "plain")
+        self.assertEqual(self.loc.get("greeting", name="kyu"), "hello kyu")
+        for i in range(100):
+            self.assertEqual(self.loc.get(f"key{i}"), f"value {i}")
+
+    def testMissingKey(self):
+        self.assertEqual(self.loc.get("missing"), "missing")
+        self.assertIn("missing", self.loc._active._compiled)  # misses are cached too
+        self.assertEqual(self.loc.get("missing"), "missing")
+
+    def testSwitchLanguage(self):
+        self.assertEqual(self.loc.available(), ["en", "jp"])
+        self.loc.set_language("jp")
+        self.assertEqual(self.loc.get("greeting", name="kyu"), "こんにちはkyuさん")
+        self.loc.set_language("en")
+        self.assertEqual(self.loc.get("greeting", name="kyu"), "hello kyu")
+
+    def testParseLanguage(self):
+        entries = parse_language("# comment\n\na = b = c\nmulti = one\\ntwo\n")
+        self.assertEqual(entries, {"a": "b = c", "multi": "one\ntwo"})
+        with self.assertRaises(Exception):
+            parse_language("a = 1\na = 2")
+
+
+class TestCompileFormat(TestCase):
+    def testPlain(self):
+        self.assertEqual(compile_format("no fields {{here}}"), "no fields {here}")
+
+    def testFields(self):
+        compiled = compile_format("{name!r} got {achv:.2f}% on {chart[0]} ({w:>{width}})")
+        self.assertIsInstance(compiled, CompiledFormat)
+        kwargs = dict(name="kyu", achv=100.5, chart=["song"], w="x", width=3)
+        self.assertEqual(compiled(**kwargs), "{name!r} got {achv:.2f}% on {chart[0]} ({w:>{width}})".format(**kwargs))
+
+    def testMissingArgument(self):
+        with self.assertRaises(KeyError):
+            compile_format("hello {name}")()
+
+
+class TestBuild(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.langdir = os.path.join(self._dir.name, "lang")
+        self.outdir = os.path.join(self._dir.name, "out")
+        os.mkdir(self.langdir)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _write(self, lang, text):
+        with open(os.path.join(self.langdir, lang), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def testMissingKey(self):
+        self._write("en", "a = a\nb = b\n")
+        self._write("jp", "a = あ\n")
+        with self.assertRaises(Exception) as ctx:
+            localisation.build(self.langdir, self.outdir)
+        self.assertIn("jp: missing b", str(ctx.exception))
+        self.assertFalse(os.path.exists(self.outdir))
+
+    def testPlaceholderMismatch(self):
+        self._write("en", "greeting = hello {name}\n")
+        self._write("jp", "greeting = こんにちは{user}\n")
+        with self.assertRaises(Exception) as ctx:
+            localisation.build(self.langdir, self.outdir)
+        self.assertIn("greeting has placeholders", str(ctx.exception))
+        self.assertFalse(os.path.exists(self.outdir))
+
+    def testPositionalField(self):
+        self._write("en", "a = {} and {0}\nb = {x:{}}\n")
+        self._write("jp", "a = {} と {0}\nb = {x:{}}\n")
+        with self.assertRaises(Exception) as ctx:
+            localisation.build(self.langdir, self.outdir)
+        self.assertIn("en: a is not a valid format string", str(ctx.exception))
+        self.assertIn("en: b is not a valid format string", str(ctx.exception))
+
+    def testBuild(self):
+        self._write("en", "# comment\ngreeting = hello {name}\n")
+        self._write("jp", "greeting = こんにちは{name}さん\n")
+        written = localisation.build(self.langdir, self.outdir)
+        self.assertEqual(sorted(os.path.basename(p) for p in written), ["en.cat", "jp.cat"])
+        loc = Localiser(self.outdir, "jp")
+        try:
+            self.assertEqual(loc.get("greeting", name="kyu"), "こんにちはkyuさん")
+            loc.set_language("en")
+            self.assertEqual(loc.get("greeting", name="kyu"), "hello kyu")
+        finally:
+            loc.close()
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from profiling import Tracer, traced, tracer
+
+
+class TestTracer(TestCase):
+    def testDisabledByDefault(self):
+        t = Tracer()
+        with t.span("parse"):
+            pass
+        t.hit("fonts")
+        self.assertEqual(t.get_events(), [])
+        self.assertEqual(t.get_caches(), [])
+
+    def testSpan(self):
+        t = Tracer()
+        t.enable()
+        with t.span("outer", "frame"):
+            with t.span("inner", "render"):
+                pass
+        events = t.get_events()
+        self.assertEqual([e["name"] for e in events], ["inner", "outer"])
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+        inner, outer = events
+        self.assertLessEqual(outer["ts"], inner["ts"])
+
+    def testHitRate(self):
+        t = Tracer()
+        t.enable()
+        self.assertIsNone(t.hit_rate("fonts"))
+        t.miss("fonts")
+        t.hit("fonts")
+        t.hit("fonts")
+        t.hit("fonts")
+        self.assertEqual(t.get_caches(), ["fonts"])
+        self.assertEqual(t.hit_rate("fonts"), 0.75)
+
+    def testCountingOnly(self):
+        t = Tracer()
+        t.counting = True
+        with t.span("frame"):
+            pass
+        t.hit("fonts")
+        self.assertEqual(t.get_events(), [])
+        self.assertEqual(t.hit_rate("fonts"), 1.0)
+
+    def testExportChromeTrace(self):
+        t = Tracer()
+        t.enable()
+        with t.span("frame"):
+            pass
+        t.count("draws", 3)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "trace.json")
+            t.export_chrome_trace(path)
+            with open(path, "r", encoding="utf-8") as f:
+                trace = json.load(f)
+        phases = sorted(e["ph"] for e in trace["traceEvents"])
+        self.assertEqual(phases, ["C", "X"])
+
+    def testTracedDecorator(self):
+        @traced("double")
+        def double(x):
+            return x * 2
+
+        tracer.clear()
+        self.assertEqual(double(2), 4)
+        self.assertEqual(tracer.get_events(), [])
+        tracer.enable()
+        try:
+            self.assertEqual(double(3), 6)
+        finally:
+            tracer.disable()
+        self.assertEqual([e["name"] for e in tracer.get_events()], ["double"])
+        tracer.clear()
@@ -0,0 +1,184 @@
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from multiprocessing import get_context
+from unittest import TestCase, skipIf
+
+from framering import FrameRing
+from service import JobFailed, RenderClient, RenderService, ResourceLimits, ServiceBusy, resource
+
+
+def warm_echo():
+    def handle(job):
+        kind, arg = job
+        if kind == "echo":
+            return arg
+        if kind == "pid":
+            return os.getpid()
+        if kind == "sleep":
+            time.sleep(arg)
+            return arg
+        if kind == "burn":
+            while True:
+                pass
+        if kind == "oom":
+            raise MemoryError()
+        if kind == "exit":
+            os._exit(1)
+        raise ValueError(arg)
+    return handle
+
+
+def warm_ring(ring):
+    # writes the job's byte into a ring slot, or sleeps inside the write
+    def handle(job):
+        kind, arg = job
+        with ring.write(timeout=1) as view:
+            if kind == "sleep":
+                time.sleep(arg)
+            view[0] = arg
+        return ring.head() - 1
+    return handle
+
+
+def warm_fragile(flag):
+    # warms up fine until the flag file shows up
+    if os.path.exists(flag):
+        raise RuntimeError("can't warm up")
+    return warm_echo()
+
+
+class TestRenderService(TestCase):
+    def testEcho(self):
+        with RenderService(warm_echo, workers=2) as service:
+            futures = [service.submit(("echo", i)) for i in range(10)]
+            self.assertEqual([f.result(10) for f in futures], list(range(10)))
+
+    def testWorkerReuse(self):
+        with RenderService(warm_echo, workers=1) as service:
+            pids = {service.submit(("pid", None)).result(10) for _ in range(5)}
+        self.assertEqual(len(pids), 1)
+
+    def testJobError(self):
+        with RenderService(warm_echo, workers=1) as service:
+            with self.assertRaises(JobFailed):
+                service.submit(("raise", "nope")).result(10)
+            # the worker survives a failing job
+            self.assertEqual(service.submit(("echo", 1)).result(10), 1)
+
+    def testTimeout(self):
+        with RenderService(warm_echo, workers=1) as service:
+            before = service.submit(("pid", None)).result(10)
+            with self.assertRaises(JobFailed):
+                service.submit(("sleep", 10), limits=ResourceLimits(timeout=0.2)).result(10)
+            after = service.submit(("pid", None)).result(10)
+        self.assertNotEqual(before, after)
+
+    @skipIf(resource is None, "no rlimits on this platform")
+    def testCpuLimit(self):
+        with RenderService(warm_echo, workers=1) as service:
+            with self.assertRaises(JobFailed):
+                service.submit(("burn", None), limits=ResourceLimits(cpu_seconds=1)).result(10)
+            self.assertEqual(service.submit(("echo", 1)).result(10), 1)
+
+    def testMemoryErrorReplacesWorker(self):
+        with RenderService(warm_echo, workers=1) as service:
+            before = service.submit(("pid", None)).result(10)
+            with self.assertRaises(JobFailed):
+                service.submit(("oom", None)).result(10)
+            after = service.submit(("pid", None)).result(10)
+        self.assertNotEqual(before, after)
+
+    def testWarmupFailuresStopService(self):
+        with tempfile.TemporaryDirectory() as d:
+            flag = os.path.join(d, "broken")
+            with RenderService(partial(warm_fragile, flag), workers=1) as service:
+                open(flag, "w").close()
+                with self.assertRaises(JobFailed):
+                    service.submit(("exit", None)).result(10)
+                try:
+                    queued = service.submit(("echo", 1))
+                except Exception:
+                    queued = None  # already gave up on the replacements
+                if queued is not None:
+                    with self.assertRaises(JobFailed):
+                        queued.result(30)
+                with self.assertRaises(Exception):
+                    service.submit(("echo", 2))
+
+    def testRejectsZeroBacklog(self):
+        with self.assertRaises(Exception):
+            RenderService(warm_echo, backlog=0)
+
+    def testBackpressure(self):
+        with RenderService(warm_echo, workers=1, backlog=1) as service:
+            running = service.submit(("sleep", 0.5))
+            time.sleep(0.2)  # let the dispatcher hand it to the worker
+            queued = service.submit(("echo", 1))
+            with self.assertRaises(ServiceBusy):
+                service.submit(("echo", 2), block=False)
+            self.assertEqual(running.result(10), 0.5)
+            self.assertEqual(queued.result(10), 1)
+
+    def testTenantLimit(self):
+        with RenderService(warm_echo, workers=1, tenant_limit=1) as service:
+            a = service.submit(("sleep", 0.2), tenant="a")
+            with self.assertRaises(ServiceBusy):
+                service.submit(("echo", 1), tenant="a")
+            b = service.submit(("echo", 2), tenant="b")
+            self.assertEqual(b.result(10), 2)
+            a.result(10)
+            self.assertEqual(service.submit(("echo", 3), tenant="a").result(10), 3)
+
+    def testRingNeedsSingleWorker(self):
+        with FrameRing(4, 4, slots=1) as ring:
+            with self.assertRaises(Exception):
+                RenderService(warm_ring, workers=2, ring=ring)
+            with self.assertRaises(Exception):
+                RenderService(partial(warm_ring, ring), workers=1)
+
+    def testRingRecoveredAfterKill(self):
+        with FrameRing(4, 4, slots=1, ctx=get_context("spawn")) as ring:
+            with RenderService(warm_ring, workers=1, ring=ring) as service:
+                # killed while holding the only slot
+                with self.assertRaises(JobFailed):
+                    service.submit(("sleep", 10), limits=ResourceLimits(timeout=0.5)).result(10)
+                self.assertEqual(service.submit(("echo", 3)).result(10), 0)
+                # nobody reads, so the next frame times out rather than hanging
+                with self.assertRaises(JobFailed):
+                    service.submit(("echo", 4)).result(10)
+                with ring.read(1) as (seq, view):
+                    self.assertEqual((seq, view[0]), (0, 3))
+
+    def testLimitsOnlyTighten(self):
+        with RenderService(warm_echo, workers=1, limits=ResourceLimits(timeout=0.2)) as service:
+            with self.assertRaises(JobFailed):
+                service.submit(("sleep", 1), limits=ResourceLimits()).result(10)
+            with self.assertRaises(JobFailed):
+                service.submit(("sleep", 1), limits=ResourceLimits(timeout=5)).result(10)
+            address = service.serve(("127.0.0.1", 0), authkey=b"test")
+            with RenderClient(address, authkey=b"test") as client:
+                with self.assertRaises(JobFailed):
+                    client.render(("sleep", 1), limits=ResourceLimits())
+
+    def testTenantFromListener(self):
+        with RenderService(warm_echo, workers=2, tenant_limit=1) as service:
+            a = service.serve(("127.0.0.1", 0), authkey=b"a", tenant="a")
+            with RenderClient(a, authkey=b"a") as first, RenderClient(a, authkey=b"a") as second:
+                slow = threading.Thread(target=first.render, args=(("sleep", 0.5),))
+                slow.start()
+                time.sleep(0.2)
+                # a second connection with the same key is the same tenant
+                with self.assertRaises(ServiceBusy):
+                    second.render(("echo", 1))
+                slow.join()
+
+    def testSocket(self):
+        with RenderService(warm_echo, workers=1) as service:
+            address = service.serve(("127.0.0.1", 0), authkey=b"test")
+            with RenderClient(address, authkey=b"test") as client:
+                self.assertEqual(client.render(("echo", "hi")), "hi")
+                with self.assertRaises(JobFailed):
+                    client.render(("raise", "nope"))